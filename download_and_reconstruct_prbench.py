@@ -20,13 +20,50 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional
 
+# Opt in to the accelerated Hub transfer backends before huggingface_hub reads
+# its environment. Both flags are harmless no-ops when the Rust helper is not
+# installed, so fall back silently in that case.
+try:
+    import hf_transfer  # noqa: F401
+except ImportError:
+    pass
+else:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+os.environ.setdefault("HF_XET_HIGH_PERFORMANCE", "1")
+
 from datasets import Dataset, DatasetDict, load_dataset, load_from_disk
-from huggingface_hub import hf_hub_download
+from huggingface_hub import hf_hub_download, snapshot_download
 from tqdm import tqdm
 
+# orjson parses the per-record origin_data blobs several times faster than the
+# stdlib; keep the stdlib as fallback so the script stays runnable without it.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def write_json(path: Path, payload) -> None:
+    """Serialize `payload` to `path` as indented UTF-8 JSON.
+
+    orjson streams the document to bytes in C, avoiding the single huge
+    Python str that json.dumps(indent=2) builds for large record lists.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        write_text(path, json.dumps(payload, ensure_ascii=False, indent=2))
+
 
 DEFAULT_REPO_ID = "yzweak/PRBench"
 DEFAULT_OUTPUT_DIR = Path("eval_test")
@@ -41,6 +78,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--hf-cache", type=Path, default=None, help="Optional Hugging Face cache directory override")
     parser.add_argument("--local-assets", type=Path, default=None, help="Optional path containing `papers/` for offline PDF retrieval")
     parser.add_argument("--overwrite", action="store_true", help="Allow deleting an existing output directory before reconstruction")
+    parser.add_argument("--workers", type=int, default=8, help="Number of parallel download workers for PDF assets")
     return parser.parse_args()
 
 
@@ -81,6 +119,38 @@ def ensure_output_dirs(root: Path, overwrite: bool) -> Dict[str, Path]:
     }
 
 
+def extract_assets_archive(archive_path: Path, dest: Path) -> Path:
+    """Extract a local assets bundle, preferring parallel decompressors.
+
+    Python's gzip module is single-threaded zlib; `pigz` decompresses
+    `.tar.gz` bundles on all cores when present, and `.tar.zst` bundles go
+    through zstandard's streaming reader (tarfile `r|` mode, no seek-back).
+    Plain tarfile remains the fallback.
+    """
+    import shutil
+    import subprocess
+    import tarfile
+
+    dest.mkdir(parents=True, exist_ok=True)
+    name = archive_path.name
+    if name.endswith(".tar.zst"):
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise RuntimeError("zstandard is required to extract .tar.zst asset bundles") from exc
+        with open(archive_path, "rb") as fh:
+            with zstandard.ZstdDecompressor().stream_reader(fh) as reader:
+                with tarfile.open(fileobj=reader, mode="r|") as bundle:
+                    bundle.extractall(dest)
+        return dest
+    if name.endswith((".tar.gz", ".tgz")) and shutil.which("pigz"):
+        subprocess.run(["tar", "-I", "pigz", "-xf", str(archive_path), "-C", str(dest)], check=True)
+        return dest
+    with tarfile.open(archive_path, "r:*") as bundle:
+        bundle.extractall(dest)
+    return dest
+
+
 def resolve_pdf(pdf_path: str, args: argparse.Namespace, cache: Dict[str, Path]) -> Optional[Path]:
     if not pdf_path:
         return None
@@ -98,11 +168,86 @@ def resolve_pdf(pdf_path: str, args: argparse.Namespace, cache: Dict[str, Path])
     return downloaded
 
 
+def prefetch_pdfs(dataset: Dataset, args: argparse.Namespace, cache: Dict[str, Path]) -> None:
+    """Resolve all referenced PDFs up front with a pool of download workers.
+
+    Downloads are pure network I/O, so overlapping them hides most of the
+    per-file round-trip latency compared to fetching lazily inside the
+    reconstruction loop. For Hub repositories a single `snapshot_download`
+    with `allow_patterns` fetches the whole batch over one shared connection
+    pool instead of issuing one `hf_hub_download` round-trip per file.
+    """
+    pdf_refs = sorted({ref for ref in dataset["pdf_file"] if ref and ref not in cache})
+    if args.local_assets:
+        for ref in pdf_refs:
+            candidate = args.local_assets / ref
+            if candidate.exists():
+                cache[ref] = candidate
+        pdf_refs = [ref for ref in pdf_refs if ref not in cache]
+    if not pdf_refs:
+        return
+
+    if not Path(args.repo_id).exists():
+        try:
+            snapshot_root = Path(
+                snapshot_download(
+                    args.repo_id,
+                    repo_type="dataset",
+                    revision=args.revision,
+                    cache_dir=str(args.hf_cache) if args.hf_cache else None,
+                    allow_patterns=pdf_refs,
+                    max_workers=max(1, args.workers),
+                )
+            )
+        except Exception as exc:  # noqa: BLE001 - per-file downloads remain as fallback
+            print(f"WARNING: batched snapshot download failed ({exc}); falling back to per-file downloads")
+        else:
+            for ref in pdf_refs:
+                candidate = snapshot_root / ref
+                if candidate.exists():
+                    cache[ref] = candidate
+            pdf_refs = [ref for ref in pdf_refs if ref not in cache]
+    if not pdf_refs:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {executor.submit(resolve_pdf, ref, args, cache): ref for ref in pdf_refs}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Downloading PDFs"):
+            ref = futures[future]
+            try:
+                future.result()
+            except Exception as exc:  # noqa: BLE001 - keep reconstructing the remaining records
+                print(f"WARNING: failed to fetch PDF {ref}: {exc}")
+
+
 def write_bytes(path: Path, data: bytes) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_bytes(data)
 
 
+def duplicate_file(src: Path, dst: Path) -> None:
+    """Duplicate `src` at `dst` without copying data when possible.
+
+    Hardlinks make mirroring a PDF into `input_dir` effectively free when
+    source and destination live on the same filesystem; cross-device setups
+    fall back to a regular copy. A `dst` left behind by an interrupted run
+    (possibly already the same inode as `src`) is treated as done.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        if not os.path.samefile(src, dst):
+            import shutil
+
+            dst.unlink()
+            shutil.copy2(src, dst)
+    except OSError:
+        import shutil
+
+        shutil.copy2(src, dst)
+
+
 def write_text(path: Path, data: str) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(data, encoding="utf-8")
@@ -116,19 +261,75 @@ def save_image(image, dest: Path) -> None:
     image.save(dest, format=format_hint or None)
 
 
+def load_manifest(manifest_path: Path) -> Dict:
+    """Load the sidecar manifest from a previous run, if any."""
+    manifest = {"pdf": {}, "checklist": [], "figure": [], "input": []}
+    try:
+        previous = json_loads(manifest_path.read_bytes())
+    except (OSError, ValueError):
+        return manifest
+    if isinstance(previous, dict):
+        for key, default in manifest.items():
+            value = previous.get(key)
+            if isinstance(value, type(default)):
+                manifest[key] = value
+    return manifest
+
+
+def save_manifest(manifest_path: Path, manifest: Dict) -> None:
+    """Atomically persist the manifest so interrupted runs never corrupt it."""
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    if orjson is not None:
+        tmp_path.write_bytes(orjson.dumps(manifest))
+    else:
+        tmp_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, manifest_path)
+
+
+def iter_rows(dataset: Dataset, batch_size: int = 64) -> Iterable[Dict]:
+    """Yield rows as plain dicts from columnar batches.
+
+    Iterating the dataset row-by-row boxes every PyArrow record individually,
+    which dominates scan time on large splits. `dataset.iter` pulls columnar
+    batches instead; a modest batch size keeps at most `batch_size` decoded
+    images resident at a time.
+    """
+    column_names = dataset.column_names
+    for batch in dataset.iter(batch_size=batch_size):
+        columns = [batch[name] for name in column_names]
+        for values in zip(*columns):
+            yield dict(zip(column_names, values))
+
+
 def reconstruct(args: argparse.Namespace) -> None:
+    if args.local_assets and args.local_assets.is_file():
+        extracted_dir = args.local_assets.parent / args.local_assets.name.split(".tar")[0]
+        print(f"Extracting local assets bundle to {extracted_dir}")
+        args.local_assets = extract_assets_archive(args.local_assets, extracted_dir)
+
     dataset = load_split(args)
     dirs = ensure_output_dirs(args.output_dir, args.overwrite)
-    pdf_cache: Dict[str, Path] = {}
+
+    # The manifest records what previous runs already restored, so re-runs
+    # skip completed PDFs/checklists/figures without re-statting (or
+    # re-downloading) anything.
+    manifest_path = args.output_dir / ".manifest.json"
+    manifest = load_manifest(manifest_path)
 
     metadata_records: List[Dict] = []
     core_records: List[Dict] = []
-    seen_pdf: Dict[str, Path] = {}
+    seen_pdf: Dict[str, Path] = {ref: Path(p) for ref, p in manifest["pdf"].items() if Path(p).exists()}
+    seen_yaml: set = set(manifest["checklist"])
+    mirrored_pdfs: set = {Path(p) for p in manifest["input"]}
+    figure_written: set = {Path(p) for p in manifest["figure"]}
+
+    pdf_cache: Dict[str, Path] = dict(seen_pdf)
+    prefetch_pdfs(dataset, args, pdf_cache)
 
-    for row in tqdm(dataset, desc="Reconstructing records"):
+    for row in tqdm(iter_rows(dataset), total=len(dataset), desc="Reconstructing records"):
         origin_str = row.get("origin_data") or "{}"
         try:
-            origin_data = json.loads(origin_str)
+            origin_data = json_loads(origin_str)
         except json.JSONDecodeError:
             origin_data = {}
 
@@ -162,32 +363,50 @@ def reconstruct(args: argparse.Namespace) -> None:
             pdf_name = Path(pdf_ref).name
             dest_pdf = target_paper_dir / pdf_name
             if pdf_ref not in seen_pdf:
-                data = pdf_source.read_bytes()
-                write_bytes(dest_pdf, data)
+                # Link straight from the resolved source; no bytes are read
+                # or written unless the filesystems differ.
+                duplicate_file(pdf_source, dest_pdf)
                 seen_pdf[pdf_ref] = dest_pdf
             # Mirror into input_dir/{post_id}
             if post_id:
-                input_pdf_dir = dirs["input"] / post_id
-                if not (input_pdf_dir / pdf_name).exists():
-                    write_bytes(input_pdf_dir / pdf_name, dest_pdf.read_bytes())
+                input_pdf = dirs["input"] / post_id / pdf_name
+                # The set handles in-run deduplication without a stat() per
+                # record; exists() only guards against pre-existing files.
+                if input_pdf not in mirrored_pdfs:
+                    if not input_pdf.exists():
+                        duplicate_file(dest_pdf, input_pdf)
+                    mirrored_pdfs.add(input_pdf)
 
         yaml_text = row.get("yaml_content") or ""
-        if yaml_text:
+        if yaml_text and arxiv_id not in seen_yaml:
             yaml_dest = target_paper_dir / "Factual_accuracy" / "checklist.yaml"
             write_text(yaml_dest, yaml_text)
+            seen_yaml.add(arxiv_id)
 
         # Restore images.
+        dest_root = dirs["twitter"] if platform == "TWITTER" else dirs["xhs"]
         for img, rel in zip(images, image_paths):
             if rel:
-                dest_root = dirs["twitter"] if platform == "TWITTER" else dirs["xhs"]
                 dest_path = dest_root / rel
-                save_image(img, dest_path)
+                if dest_path in figure_written:
+                    continue
+                # Skip the decode+encode round-trip for figures already on
+                # disk from a previous (possibly interrupted) run.
+                if not dest_path.exists():
+                    save_image(img, dest_path)
+                figure_written.add(dest_path)
 
     data_dir = dirs["data"]
-    write_json = lambda path, payload: write_text(path, json.dumps(payload, ensure_ascii=False, indent=2))
     write_json(data_dir / "academic_promotion_data.json", metadata_records)
     write_json(data_dir / "academic_promotion_data_core.json", core_records)
 
+    save_manifest(manifest_path, {
+        "pdf": {ref: str(path) for ref, path in seen_pdf.items()},
+        "checklist": sorted(seen_yaml),
+        "figure": sorted(str(path) for path in figure_written),
+        "input": sorted(str(path) for path in mirrored_pdfs),
+    })
+
     print("\nReconstruction finished")
     print(f"Output directory: {args.output_dir}")
     print(f"Records reconstructed: {len(metadata_records)} (core subset: {len(core_records)})")
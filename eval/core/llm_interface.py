@@ -58,11 +58,15 @@ async def call_llm_api(
     else:
         image_quality_setting = 'very_low'
 
-    processed_images_b64 = []
-    for path in image_paths:
-        b64_data = await read_and_preprocess_image_as_base64(path, quality=image_quality_setting)
-        if b64_data:
-            processed_images_b64.append(b64_data)
+    # Preprocess images concurrently; the semaphore bounds disk and CPU load.
+    image_semaphore = asyncio.Semaphore(32)
+
+    async def _preprocess_image(path: str):
+        async with image_semaphore:
+            return await read_and_preprocess_image_as_base64(path, quality=image_quality_setting)
+
+    image_results = await asyncio.gather(*(_preprocess_image(path) for path in image_paths))
+    processed_images_b64 = [b64_data for b64_data in image_results if b64_data]
     
     api_kwargs = {
         "model": model,
@@ -1,9 +1,50 @@
+import asyncio
 import base64
+import concurrent.futures
+import os
 import aiofiles
 import fitz  # PyMuPDF
+import numpy as np
 from io import BytesIO
 from PIL import Image
 
+# Optional libjpeg-turbo encoder: SIMD-accelerated, ~3x faster than PIL's
+# libjpeg binding. The instance is cached at module load; PIL remains the
+# fallback when PyTurboJPEG or the native library is unavailable.
+try:
+    from turbojpeg import TJPF_RGB, TurboJPEG
+    _turbojpeg = TurboJPEG()
+except Exception:
+    _turbojpeg = None
+
+# Optional SIMD base64: single-pass encode straight to str, ~4x the stdlib
+# rate and no intermediate bytes copies.
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+
+def _b64encode_as_string(data) -> str:
+    if pybase64 is not None:
+        return pybase64.b64encode_as_string(data)
+    return base64.b64encode(data).decode('utf-8')
+
+# Optional PDFium backend: typically 2-4x faster than PyMuPDF for plain text
+# extraction. Opt in with PRBENCH_PDF_BACKEND=pdfium; PyMuPDF stays the default
+# and the fallback when pypdfium2 is not installed.
+_pdfium = None
+if os.environ.get("PRBENCH_PDF_BACKEND", "").lower() == "pdfium":
+    try:
+        import pypdfium2 as _pdfium
+    except ImportError:
+        print("WARNING: PRBENCH_PDF_BACKEND=pdfium but pypdfium2 is not installed; using PyMuPDF")
+
+# Shared pool for CPU-bound image work (PIL decode/resize + JPEG encode), so
+# coroutines that preprocess many images in parallel do not serialize on the
+# event loop thread.
+_JPEG_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count())
+
 QUALITY_SETTINGS = {
     'high': {'max_size': (2048, 2048), 'jpeg_quality': 95},
     'medium': {'max_size': (1024, 1024), 'jpeg_quality': 85},
@@ -11,6 +52,28 @@ QUALITY_SETTINGS = {
     'very_low': {'max_size': (512, 512), 'jpeg_quality': 70}
 }
 
+def _encode_image_sync(image_data: bytes, settings: dict) -> str:
+    """CPU-bound resize + JPEG encode + base64, meant to run on _JPEG_POOL."""
+    max_size = settings['max_size']
+    jpeg_quality = settings['jpeg_quality']
+
+    with Image.open(BytesIO(image_data)) as img:
+        img.thumbnail(max_size, Image.Resampling.BILINEAR)
+
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        if _turbojpeg is not None:
+            jpeg_bytes = _turbojpeg.encode(np.asarray(img), quality=jpeg_quality, pixel_format=TJPF_RGB)
+        else:
+            buffer = BytesIO()
+            img.save(buffer, format="JPEG", quality=jpeg_quality)
+            # getbuffer() is a zero-copy view into the BytesIO payload.
+            jpeg_bytes = buffer.getbuffer()
+
+        return _b64encode_as_string(jpeg_bytes)
+
+
 async def read_and_preprocess_image_as_base64(image_path: str, quality: str = 'high') -> str | None:
     """
     Asynchronously reads and preprocesses an image based on the specified quality level,
@@ -27,24 +90,14 @@ async def read_and_preprocess_image_as_base64(image_path: str, quality: str = 'h
         raise ValueError(f"Invalid quality setting: {quality}. Must be one of {list(QUALITY_SETTINGS.keys())}")
 
     settings = QUALITY_SETTINGS[quality]
-    max_size = settings['max_size']
-    jpeg_quality = settings['jpeg_quality']
 
     try:
         async with aiofiles.open(image_path, "rb") as image_file:
             image_data = await image_file.read()
-            
-            with Image.open(BytesIO(image_data)) as img:
-                img.thumbnail(max_size)
-                
-                buffer = BytesIO()
-                if img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-                img.save(buffer, format="JPEG", quality=jpeg_quality)
-                
-                encoded_string = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                return encoded_string
-                
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_JPEG_POOL, _encode_image_sync, image_data, settings)
+
     except FileNotFoundError:
         print(f"ERROR: Image file not found at {image_path}")
         return None
@@ -53,19 +106,64 @@ async def read_and_preprocess_image_as_base64(image_path: str, quality: str = 'h
         return None
 
 
-async def extract_text_from_pdf(pdf_path: str) -> str | None:
-    """Extracts all text from a PDF file."""
+def _extract_text_sync(pdf_path: str, max_pages: int | None) -> str:
+    """Synchronous text extraction, meant to run on a worker thread."""
+    if _pdfium is not None:
+        pdf = _pdfium.PdfDocument(pdf_path)
+        try:
+            page_count = len(pdf) if max_pages is None else min(max_pages, len(pdf))
+            return "\n".join(pdf[i].get_textpage().get_text_range() for i in range(page_count))
+        finally:
+            pdf.close()
+    text = ""
+    with fitz.open(pdf_path) as doc:
+        for page_index, page in enumerate(doc):
+            if max_pages is not None and page_index >= max_pages:
+                break
+            text += page.get_text()
+    return text
+
+
+def preprocess_images_batch(image_paths: list, quality: str = 'high') -> list:
+    """Synchronous fast path for preprocessing a batch of images.
+
+    Encodes all images on _JPEG_POOL at once, so callers holding more than
+    one path pay the Python-level dispatch overhead once per batch instead
+    of once per image; the decode/resize/encode itself runs in GIL-releasing
+    native code. Failed images yield None, mirroring the async variant.
+    """
+    if quality not in QUALITY_SETTINGS:
+        raise ValueError(f"Invalid quality setting: {quality}. Must be one of {list(QUALITY_SETTINGS.keys())}")
+
+    settings = QUALITY_SETTINGS[quality]
+
+    def _process(image_path: str):
+        try:
+            with open(image_path, "rb") as image_file:
+                return _encode_image_sync(image_file.read(), settings)
+        except FileNotFoundError:
+            print(f"ERROR: Image file not found at {image_path}")
+            return None
+        except Exception as e:
+            print(f"ERROR: Could not read or preprocess image at {image_path}: {e}")
+            return None
+
+    return list(_JPEG_POOL.map(_process, image_paths))
+
+
+async def extract_text_from_pdf(pdf_path: str, max_pages: int | None = 1) -> str | None:
+    """Extracts text from a PDF file without blocking the event loop.
+
+    PyMuPDF releases the GIL during parsing, so offloading to the default
+    executor lets concurrent extractions overlap instead of serializing on
+    the event loop. `max_pages` limits extraction (default: first page only,
+    matching the previous hardcoded behavior); pass None for all pages.
+    """
     if not pdf_path:
         return None
     try:
-        text = ""
-        # PyMuPDF is not async, run in a thread to avoid blocking if necessary,
-        # but for this script, direct call is acceptable.
-        with fitz.open(pdf_path) as doc:
-            for page in doc:
-                text += page.get_text()
-                break  # Remove this line if you want to extract text from all pages
-        return text
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _extract_text_sync, pdf_path, max_pages)
     except FileNotFoundError:
         print(f"ERROR: PDF file not found at {pdf_path}")
         return None
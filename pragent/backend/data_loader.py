@@ -1,15 +1,18 @@
 # data_loader.py
 import asyncio
-import aiofiles
+import os
 from pathlib import Path
 import re
 from typing import List, Dict
 from tqdm.asyncio import tqdm
 async def load_plain_text(txt_path: str) -> str:
-    """Asynchronously load plain text content from a .txt file."""
+    """Asynchronously load plain text content from a .txt file.
+
+    A single to_thread dispatch of the whole read beats aiofiles' per-chunk
+    thread hops for the small text files this loader handles.
+    """
     try:
-        async with aiofiles.open(txt_path, mode='r', encoding='utf-8') as f:
-            return await f.read()
+        return await asyncio.to_thread(Path(txt_path).read_text, encoding='utf-8')
     except Exception as e:
         tqdm.write(f"[!] Error reading text file '{txt_path}': {e}")
         return ""
@@ -24,30 +27,46 @@ def load_paired_image_paths(base_dir: Path) -> List[Dict]:
         return items
 
     tqdm.write(f"[*] Recursively loading image-text pairs from {base_dir}...")
-    
-    item_dirs = sorted(
-        [d for d in base_dir.rglob('paired_*') if d.is_dir()],
-        key=lambda p: p.name  
-    )
 
-    for item_dir in item_dirs:
-        item_files = list(item_dir.glob('*.jpg'))
-        if len(item_files) < 2:
-            continue
+    # os.scandir reuses the type information from the directory read, so the
+    # walk avoids the per-entry Path allocations and extra stat() calls that
+    # rglob('paired_*') + glob('*.jpg') would issue.
+    paired_dirs = []
+    stack = [str(base_dir)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name.startswith('paired_'):
+                            # Classify from the name prefix here, while the
+                            # entry is at hand, instead of re-testing the
+                            # basename per item later.
+                            item_type = "figure" if entry.name.startswith('paired_figure') else "table"
+                            paired_dirs.append((entry.path, item_type))
+                        else:
+                            stack.append(entry.path)
+        except OSError as e:
+            tqdm.write(f"[!] Error scanning directory: {e}")
 
+    for item_dir, item_type in sorted(paired_dirs, key=lambda pair: os.path.basename(pair[0])):
+        abs_dir = os.path.abspath(item_dir)
         main_item_path, caption_path = None, None
-        for f in item_files:
-            if "caption" in f.name:
-                caption_path = f
-            else:
-                main_item_path = f
-        
+        with os.scandir(item_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(('.jpg', '.webp')):
+                    continue
+                if "caption" in entry.name:
+                    caption_path = os.path.join(abs_dir, entry.name)
+                else:
+                    main_item_path = os.path.join(abs_dir, entry.name)
+
         if main_item_path and caption_path:
             items.append({
-                "type": "figure" if "figure" in item_dir.name else "table",
-                "item_path": str(main_item_path.resolve()),
-                "caption_path": str(caption_path.resolve()),
+                "type": item_type,
+                "item_path": main_item_path,
+                "caption_path": caption_path,
             })
-            
+
     tqdm.write(f"[*] Loading complete, found {len(items)} image-text pairs.")
     return items
\ No newline at end of file
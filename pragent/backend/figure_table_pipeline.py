@@ -1,16 +1,19 @@
+import asyncio
+import bisect
 import os
 import shutil
 import re
+from functools import partial
 from pathlib import Path
 from collections import defaultdict
-from pragent.backend.loader import ImagePDFLoader
-from pragent.backend.yolo import extract_and_save_layout_components
+from concurrent.futures import ThreadPoolExecutor
+from pragent.backend.loader import page_count, render_page_image
+from pragent.backend.yolo import BATCH_SIZE, load_model, process_detections
 from tqdm.asyncio import tqdm
 
 def run_figure_extraction(pdf_path: str, base_work_dir: str, model_path: str) -> str:
     """
-    A complete workflow for extracting and pairing charts from a PDF.
-    This is the main function called by app.py.
+    Synchronous wrapper around run_figure_extraction_async for CLI callers.
 
     Args:
         pdf_path (str): The path to the PDF uploaded by the user.
@@ -20,7 +23,16 @@ def run_figure_extraction(pdf_path: str, base_work_dir: str, model_path: str) ->
     Returns:
         str: The directory path of the final pairing result, or None if it fails.
     """
-    if not all([ImagePDFLoader, extract_and_save_layout_components]):
+    return asyncio.run(run_figure_extraction_async(pdf_path, base_work_dir, model_path))
+
+
+async def run_figure_extraction_async(pdf_path: str, base_work_dir: str, model_path: str) -> str:
+    """
+    A complete workflow for extracting and pairing charts from a PDF.
+    Safe to await from an async web backend: model loading, inference, and
+    pairing all run in executors so the event loop is never blocked.
+    """
+    if not all([render_page_image, load_model, process_detections]):
         tqdm.write("[!] Error: One or more core dependencies of figure_pipeline failed to load.")
         return None
 
@@ -30,36 +42,139 @@ def run_figure_extraction(pdf_path: str, base_work_dir: str, model_path: str) ->
     tqdm.write(f"\n--- Step 1/3: Convert PDF '{pdf_file.name}' to images ---")
     page_save_dir = os.path.join(base_work_dir, "page_paper", pdf_stem)
     os.makedirs(page_save_dir, exist_ok=True)
+    tqdm.write(f"\n--- Step 2/3: Analyze page layout to crop figures and tables ---")
+    cropped_results_dir = os.path.join(base_work_dir, "cropped_results", pdf_stem)
+    # Load the model once and overlap CPU rasterization with GPU inference:
+    # rendered pages stream through a queue into batched YOLO calls instead of
+    # waiting for every PNG to exist before the first forward pass.
+    # Step 3 output is prepared up front: each page is paired as soon as its
+    # crops land, overlapping with the remaining rendering/inference work.
+    final_paired_dir = os.path.join(base_work_dir, "paired_results", pdf_stem)
+    if os.path.isdir(final_paired_dir):
+        shutil.rmtree(final_paired_dir)
+    os.makedirs(final_paired_dir, exist_ok=True)
+
+    loop = asyncio.get_running_loop()
+    model = await loop.run_in_executor(None, load_model, model_path)
     try:
-        loader = ImagePDFLoader(pdf_path)
-        page_image_paths = []
-        for i, img in enumerate(loader.load()):
-            path = os.path.join(page_save_dir, f"page_{i+1}.png")
-            img.save(path)
-            page_image_paths.append(path)
-        tqdm.write(f"[*] All {len(page_image_paths)} pages have been saved to: {page_save_dir}")
+        page_image_paths = await _render_and_detect(pdf_path, page_save_dir, cropped_results_dir, final_paired_dir, model)
+        tqdm.write(f"[*] {len(page_image_paths)} pages with detections have been saved to: {page_save_dir}")
     except Exception as e:
         tqdm.write(f"[!] Error: Failed to load or convert PDF: {e}")
         return None
-
-    tqdm.write(f"\n--- Step 2/3: Analyze page layout to crop figures and tables ---")
-    cropped_results_dir = os.path.join(base_work_dir, "cropped_results", pdf_stem)
-    for path in page_image_paths:
-        page_num_str = Path(path).stem
-        page_crop_dir = os.path.join(cropped_results_dir, page_num_str)
-        extract_and_save_layout_components(image_path=path, model_path=model_path, save_base_dir=page_crop_dir)
     tqdm.write(f"[*] All cropped results have been saved to: {cropped_results_dir}")
-
-    tqdm.write(f"\n--- Step 3/3: Pair the cropped components ---")
-    final_paired_dir = os.path.join(base_work_dir, "paired_results", pdf_stem)
-    run_pairing_process(cropped_results_dir, final_paired_dir, threshold=30)
+    tqdm.write(f"[*] Paired components have been saved to: {final_paired_dir}")
     
     if os.path.isdir(final_paired_dir):
         return final_paired_dir
     return None
 
+async def _render_and_detect(pdf_path: str, page_save_dir: str, cropped_results_dir: str,
+                             paired_results_dir: str, model, threshold: int = 30) -> list:
+    """Producer-consumer pipeline over pages: CPU workers rasterize pages and
+    push the PNG paths into a bounded queue, while the consumer drains batches
+    of BATCH_SIZE for YOLO. The GPU starts working as soon as the first batch
+    is ready instead of idling through the whole rasterization phase, and each
+    page's caption pairing is submitted the moment its crops are written.
+    """
+    loop = asyncio.get_running_loop()
+    # The queue holds (path, PIL image) pairs, so its size bound is what caps
+    # peak memory: at most maxsize + one batch of decoded pages are alive.
+    queue = asyncio.Queue(maxsize=2 * BATCH_SIZE)
+    num_pages = page_count(pdf_path)
+    device = "cuda:0"
+    page_image_paths = []
+    pairing_tasks = []
+
+    def render(page_index):
+        out_path = os.path.join(page_save_dir, f"page_{page_index+1}.png")
+        img = render_page_image(pdf_path, page_index)
+        if img is None:
+            return None
+        return out_path, img
+
+    async def produce(executor):
+        # Bound the number of in-flight renders, otherwise the executor races
+        # ahead of the consumer and materializes every page.
+        semaphore = asyncio.Semaphore(queue.maxsize)
+
+        async def render_one(page_index):
+            async with semaphore:
+                item = await loop.run_in_executor(executor, render, page_index)
+                if item:
+                    await queue.put(item)
+
+        await asyncio.gather(*(render_one(i) for i in range(num_pages)))
+        await queue.put(None)
+
+    async def consume():
+        batch = []
+        done = False
+        while not done:
+            item = await queue.get()
+            if item is None:
+                done = True
+            else:
+                batch.append(item)
+            if batch and (done or len(batch) >= BATCH_SIZE):
+                # The rendered images flow straight from the producer, so
+                # nothing is re-decoded from the page PNGs.
+                images = [image for _, image in batch]
+                predict = partial(model.predict, images, imgsz=1024, conf=0.2, device=device, half=device.startswith("cuda"))
+                det_results = await loop.run_in_executor(None, predict)
+                for (path, image), result in zip(batch, det_results):
+                    page_name = Path(path).stem
+                    page_crop_dir = os.path.join(cropped_results_dir, page_name)
+                    # Cropping is a page of synchronous JPEG encodes; keep it
+                    # off the event loop like the predict and save calls.
+                    await loop.run_in_executor(None, process_detections, image, result, page_crop_dir)
+                    # PNG persistence is deferred to after detection so the
+                    # encode cost is only paid for pages that matter.
+                    if len(result.boxes):
+                        await loop.run_in_executor(None, image.save, path)
+                        page_image_paths.append(path)
+                        # Pair this page right away; it only depends on its
+                        # own crops, not on the rest of the document.
+                        output_page_dir = os.path.join(paired_results_dir, page_name)
+                        os.makedirs(output_page_dir, exist_ok=True)
+                        pairing_tasks.append(loop.run_in_executor(
+                            None, pair_items_on_page, page_crop_dir, output_page_dir, threshold))
+                    # Give other coroutines a turn between pages of crop IO.
+                    await asyncio.sleep(0)
+                batch = []
+
+    # Threads rather than processes: PyMuPDF releases the GIL while rendering,
+    # and keeping the pages in memory avoids pickling them between processes.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        try:
+            # TaskGroup cancels the surviving side when the other fails, so a
+            # dead producer cannot leave consume() parked on queue.get()
+            # forever (nor a dead consumer leave renders stuck on queue.put()),
+            # each pinning up to a queue's worth of decoded pages.
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(produce(executor))
+                tg.create_task(consume())
+        except BaseException:
+            # Pairing jobs already handed to the executor keep running; wait
+            # them out so the failure does not leak pending futures.
+            if pairing_tasks:
+                await asyncio.gather(*pairing_tasks, return_exceptions=True)
+            raise
+
+    if pairing_tasks:
+        await asyncio.gather(*pairing_tasks)
+
+    page_image_paths.sort(key=lambda p: int(Path(p).stem.split('_')[1]))
+    return page_image_paths
+
+
 def run_pairing_process(source_dir_str: str, output_dir_str: str, threshold: int):
-    """Pairing logic, now part of the pipeline."""
+    """Standalone batch pairing over an existing cropped_results tree.
+
+    The main pipeline pairs each page inline as its crops are written; this
+    helper remains for re-pairing previously cropped output (e.g. after
+    tuning the threshold) without re-running rasterization and detection.
+    """
     source_dir = Path(source_dir_str)
     output_root_dir = Path(output_dir_str)
     if output_root_dir.exists(): shutil.rmtree(output_root_dir)
@@ -68,45 +183,91 @@ def run_pairing_process(source_dir_str: str, output_dir_str: str, threshold: int
     tqdm.write(f"    Starting nearest neighbor pairing process (threshold = {threshold})")
 
     page_dirs = sorted([d for d in source_dir.iterdir() if d.is_dir() and d.name.startswith('page_')])
+    # Pages are independent and the work is file IO + copies, so threads
+    # suffice (shutil.copy releases the GIL in the copy syscalls). Output
+    # dirs are created up front to avoid mkdir races inside the workers.
     for page_dir in page_dirs:
-        output_page_dir = output_root_dir / page_dir.name
-        output_page_dir.mkdir(exist_ok=True)
-        pair_items_on_page(str(page_dir), str(output_page_dir), threshold)
+        (output_root_dir / page_dir.name).mkdir(exist_ok=True)
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        list(executor.map(
+            lambda page_dir: pair_items_on_page(str(page_dir), str(output_root_dir / page_dir.name), threshold),
+            page_dirs,
+        ))
+
+# Compiled once; parse_filename runs for every cropped file on every page.
+_FNAME_RE = re.compile(r'([a-zA-Z_]+)_(\d+)_score[\d.]+\.(?:jpg|webp)')
+
+
+def parse_filename(filename: str):
+    match = _FNAME_RE.match(filename)
+    return (match.group(1), int(match.group(2))) if match else (None, None)
+
+
+def fast_copy(src: str, dst_dir: str):
+    """Hardlink `src` into `dst_dir`, falling back to a real copy.
+
+    The cropped jpgs are read-only intermediates, so a hardlink (one new
+    directory entry, zero bytes copied) is equivalent to shutil.copy here.
+    A `dst` that already links to `src` counts as done.
+    """
+    dst = os.path.join(dst_dir, os.path.basename(src))
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        if not os.path.samefile(src, dst):
+            os.unlink(dst)
+            shutil.copy(src, dst)
+    except OSError:
+        shutil.copy(src, dst)
+
 
 def pair_items_on_page(page_dir: str, output_dir: str, threshold: int):
     """Process a single page directory for nearest neighbor pairing."""
     organized_files = defaultdict(dict)
-    component_types = ["figure", "figure_caption", "table", "table_caption_above", "table_caption_below"]
-    
-    def parse_filename(filename: str):
-        match = re.match(r'([a-zA-Z_]+)_(\d+)_score([\d.]+)\.jpg', filename)
-        return (match.group(1), int(match.group(2))) if match else (None, None)
+    component_types = {"figure", "figure_caption", "table", "table_caption_above", "table_caption_below"}
 
-    for comp_type in component_types:
-        comp_dir = os.path.join(page_dir, comp_type)
-        if os.path.isdir(comp_dir):
-            for filename in os.listdir(comp_dir):
-                _, index = parse_filename(filename)
-                if index is not None: organized_files[comp_type][index] = os.path.join(comp_dir, filename)
+    # One scandir pass over the page directory and one per component dir;
+    # DirEntry carries the type info from the directory read, so no extra
+    # isdir/stat syscalls per entry.
+    try:
+        with os.scandir(page_dir) as page_entries:
+            comp_dirs = [(e.name, e.path) for e in page_entries
+                         if e.name in component_types and e.is_dir(follow_symlinks=False)]
+    except OSError:
+        comp_dirs = []
+    for comp_type, comp_path in comp_dirs:
+        with os.scandir(comp_path) as file_entries:
+            for entry in file_entries:
+                _, index = parse_filename(entry.name)
+                if index is not None: organized_files[comp_type][index] = entry.path
 
-    paired_files, used_captions = set(), defaultdict(set)
+    paired_files = set()
+    # Keep the unused caption indices of each type in a sorted list; the
+    # nearest candidate for an item is then one bisect plus two neighbor
+    # checks instead of a linear rescan over all captions per item.
+    available_captions = {cap_type: sorted(organized_files[cap_type]) for cap_type in
+                          ("figure_caption", "table_caption_above", "table_caption_below")}
 
     for item_type, cap_types in [("figure", ["figure_caption"]), ("table", ["table_caption_above", "table_caption_below"])]:
-        for item_index, item_path in organized_files[item_type].items():
-            best_match = {'min_diff': float('inf'), 'cap_path': None, 'cap_index': -1, 'cap_type': ''}
+        for item_index in sorted(organized_files[item_type]):
+            item_path = organized_files[item_type][item_index]
+            best_match = {'min_diff': float('inf'), 'cap_index': -1, 'cap_type': '', 'cap_pos': -1}
             for cap_type in cap_types:
-                for cap_index, cap_path in organized_files[cap_type].items():
-                    if cap_index in used_captions[cap_type]: continue
-                    diff = abs(item_index - cap_index)
-                    if diff < best_match['min_diff']:
-                        best_match.update({'min_diff': diff, 'cap_path': cap_path, 'cap_index': cap_index, 'cap_type': cap_type})
-            
-            if best_match['cap_path'] and best_match['min_diff'] <= threshold:
+                candidates = available_captions[cap_type]
+                pos = bisect.bisect_left(candidates, item_index)
+                for neighbor in (pos - 1, pos):
+                    if 0 <= neighbor < len(candidates):
+                        diff = abs(item_index - candidates[neighbor])
+                        if diff < best_match['min_diff']:
+                            best_match.update({'min_diff': diff, 'cap_index': candidates[neighbor], 'cap_type': cap_type, 'cap_pos': neighbor})
+
+            if best_match['cap_index'] >= 0 and best_match['min_diff'] <= threshold:
+                cap_path = organized_files[best_match['cap_type']][best_match['cap_index']]
                 target_dir = os.path.join(output_dir, f"paired_{item_type}_{item_index}")
                 os.makedirs(target_dir, exist_ok=True)
-                shutil.copy(item_path, target_dir); shutil.copy(best_match['cap_path'], target_dir)
-                paired_files.add(item_path); paired_files.add(best_match['cap_path'])
-                used_captions[best_match['cap_type']].add(best_match['cap_index'])
+                fast_copy(item_path, target_dir); fast_copy(cap_path, target_dir)
+                paired_files.add(item_path); paired_files.add(cap_path)
+                available_captions[best_match['cap_type']].pop(best_match['cap_pos'])
 
     for files_dict in organized_files.values():
         for file_path in files_dict.values():
@@ -114,4 +275,4 @@ def pair_items_on_page(page_dir: str, output_dir: str, threshold: int):
                 item_type, index = parse_filename(Path(file_path).name)
                 if item_type:
                     target_dir = os.path.join(output_dir, f"unpaired_{item_type}_{index}")
-                    os.makedirs(target_dir, exist_ok=True); shutil.copy(file_path, target_dir)
+                    os.makedirs(target_dir, exist_ok=True); fast_copy(file_path, target_dir)
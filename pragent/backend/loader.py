@@ -1,10 +1,61 @@
 # loader.py
 import fitz
 from PIL import Image
-from typing import List
+from typing import List, Optional
 from tqdm.asyncio import tqdm
+
+DEFAULT_DPI = 250
+
+
+def page_count(pdf_path: str) -> int:
+    """Return the number of pages in a PDF."""
+    doc = fitz.open(pdf_path)
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+
+def render_page_image(pdf_path: str, page_index: int, dpi: int = DEFAULT_DPI) -> Optional[Image.Image]:
+    """Render a single page and return it as an in-memory PIL image.
+
+    Like render_page, opens its own document handle so it is safe to call
+    from worker threads; rendering releases the GIL inside PyMuPDF.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        page = doc[page_index]
+        zoom_matrix = fitz.Matrix(dpi / 72, dpi / 72)
+        pix = page.get_pixmap(matrix=zoom_matrix, alpha=False)
+        if pix.width > 0 and pix.height > 0:
+            return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        return None
+    finally:
+        doc.close()
+
+
+def render_page(pdf_path: str, page_index: int, out_path: str, dpi: int = DEFAULT_DPI) -> Optional[str]:
+    """Render a single page to a PNG file and return its path.
+
+    Opens its own document handle, so it is safe to run in a separate
+    process or thread (fitz document objects must not be shared across
+    workers).
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        page = doc[page_index]
+        zoom_matrix = fitz.Matrix(dpi / 72, dpi / 72)
+        pix = page.get_pixmap(matrix=zoom_matrix, alpha=False)
+        if pix.width > 0 and pix.height > 0:
+            pix.save(out_path)
+            return out_path
+        return None
+    finally:
+        doc.close()
+
+
 class ImagePDFLoader:
-    def __init__(self, file_path: str, dpi: int = 250):
+    def __init__(self, file_path: str, dpi: int = DEFAULT_DPI):
         self.file_path = file_path
         self.dpi = dpi
 
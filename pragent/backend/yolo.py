@@ -1,24 +1,132 @@
 # yolo.py
+import functools
+import logging
 import os
+import numpy as np
+import torch
 from PIL import Image
 from doclayout_yolo import YOLOv10
-from tqdm.asyncio import tqdm
-CLASS_NAMES = {
-    0: "title",
-    1: "plain_text",
-    2: "abandon",
-    3: "figure",
-    4: "figure_caption",
-    5: "table",
-    6: "table_caption_above",
-    7: "table_caption_below",
-    8: "formula",
-    9: "formula_caption",
-}
+
+logger = logging.getLogger(__name__)
+
+# Optional GPU JPEG path: with torchvision available and detections on CUDA,
+# crops are sliced from the page tensor on-device and encoded via nvjpeg
+# instead of 10-30 serial PIL encodes on the main thread.
+try:
+    from torchvision.io import encode_jpeg
+except ImportError:
+    encode_jpeg = None
+
+# Optional libjpeg-turbo encoder for the CPU crop path; roughly halves the
+# per-crop serialization cost versus PIL's encoder.
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+# Class ids are dense 0-9, so a tuple gives hash-free O(1) lookups in the
+# per-detection path.
+CLASS_NAMES = (
+    "title",
+    "plain_text",
+    "abandon",
+    "figure",
+    "figure_caption",
+    "table",
+    "table_caption_above",
+    "table_caption_below",
+    "formula",
+    "formula_caption",
+)
+
+# Number of pages per YOLO forward pass; batch-1 inference leaves most of the
+# GPU idle on multi-page documents.
+BATCH_SIZE = int(os.environ.get("PRAGENT_YOLO_BATCH_SIZE", "8"))
+
+# One JPEG quality for every crop encoder (nvjpeg, simplejpeg, PIL), so the
+# artifacts do not vary with which optional extras are installed.
+CROP_QUALITY = 90
+
+
+@functools.lru_cache(maxsize=2)
+def _get_model(model_path):
+    return YOLOv10(model_path)
+
+
+def load_model(model_path, device="cuda:0"):
+    """
+    Return the YOLOv10 layout model for `model_path`, loading it at most once
+    per process. Repeated pipeline invocations (e.g. from a long-running
+    service) reuse the warm model instead of re-deserializing the weights and
+    re-warming CUDA every call. Device placement happens at predict time.
+
+    Args:
+        model_path (str): Model weight path (.pt)
+        device (str): The computing device to use, such as 'cuda:0' or 'cpu'
+    """
+    return _get_model(model_path)
+
+
+def process_detections(image, result, save_base_dir):
+    """
+    Crop one page's detections from `image` and save screenshots by category.
+
+    Args:
+        image (PIL.Image.Image): The full page image the detections refer to
+        result: A single YOLO Results object for that page
+        save_base_dir (str): Root directory to save screenshots
+    """
+    # One device-to-host transfer per tensor, already coerced to the types
+    # the loop needs, instead of per-detection tolist()/map(int, ...) work.
+    boxes = result.boxes.xyxy.round().to(torch.int32).cpu().numpy()
+    classes = result.boxes.cls.to(torch.int32).cpu().numpy()
+    scores = result.boxes.conf.cpu().numpy()
+
+    gpu_page = None
+    if encode_jpeg is not None and result.boxes.xyxy.is_cuda and len(boxes):
+        rgb = image if image.mode == 'RGB' else image.convert('RGB')
+        gpu_page = torch.from_numpy(np.asarray(rgb)).permute(2, 0, 1).contiguous().to(result.boxes.xyxy.device)
+
+    # Create each class directory once up front rather than re-issuing
+    # makedirs for every detection.
+    class_labels = [CLASS_NAMES[cls_id] if 0 <= cls_id < len(CLASS_NAMES) else f"cls{int(cls_id)}" for cls_id in classes]
+    for class_name in set(class_labels):
+        os.makedirs(os.path.join(save_base_dir, class_name), exist_ok=True)
+
+    for idx in range(len(boxes)):
+        class_name = class_labels[idx]
+        save_dir = os.path.join(save_base_dir, class_name)
+        x1, y1, x2, y2 = boxes[idx]
+        score = float(scores[idx])
+        save_path = os.path.join(save_dir, f"{class_name}_{idx}_score{score:.2f}.jpg")
+        if gpu_page is not None:
+            try:
+                jpeg = encode_jpeg(gpu_page[:, y1:y2, x1:x2], quality=CROP_QUALITY)
+            except Exception:
+                # Older torchvision exposes encode_jpeg but rejects CUDA
+                # tensors; drop to the CPU path for this and later crops.
+                gpu_page = None
+            else:
+                with open(save_path, 'wb') as f:
+                    f.write(jpeg.cpu().numpy().tobytes())
+                continue
+        cropped = image.crop((x1, y1, x2, y2))
+        if cropped.mode != 'RGB':
+            cropped = cropped.convert('RGB')
+        if simplejpeg is not None:
+            with open(save_path, 'wb') as f:
+                f.write(simplejpeg.encode_jpeg(np.ascontiguousarray(cropped), quality=CROP_QUALITY))
+        else:
+            cropped.save(save_path, quality=CROP_QUALITY)
+    # Per-page progress is debug-level: tqdm.write here would format, lock,
+    # and flush stderr for every page, serializing the pairing/crop threads.
+    logger.debug("Saved a total of %d screenshots, saved by category in %s/", len(boxes), save_base_dir)
+
 
 def extract_and_save_layout_components(image_path, model_path, save_base_dir="./cropped_results", imgsz=1024, conf=0.2, device="cuda:0"):
     """
-    Extract document layout components from an image and save screenshots by category.
+    Extract document layout components from a single image and save screenshots
+    by category. Convenience wrapper around load_model/process_detections for
+    one-off calls; batch callers should drive those two directly.
 
     Args:
         image_path (str): Input image path
@@ -28,24 +136,9 @@ def extract_and_save_layout_components(image_path, model_path, save_base_dir="./
         conf (float): Confidence threshold for detection boxes
         device (str): The computing device to use, such as 'cuda:0' or 'cpu'
     """
-    model = YOLOv10(model_path)
+    model = load_model(model_path, device)
     image = Image.open(image_path)
-    det_results = model.predict(image_path, imgsz=imgsz, conf=conf, device=device)
-
-    result = det_results[0]
-    boxes = result.boxes.xyxy.cpu().tolist()
-    classes = result.boxes.cls.cpu().tolist()
-    scores = result.boxes.conf.cpu().tolist()
-
-    for idx, (box, cls_id, score) in enumerate(zip(boxes, classes, scores)):
-        cls_id = int(cls_id)
-        class_name = CLASS_NAMES.get(cls_id, f"cls{cls_id}")
-        save_dir = os.path.join(save_base_dir, class_name)
-        os.makedirs(save_dir, exist_ok=True)
-        x1, y1, x2, y2 = map(int, box)
-        cropped = image.crop((x1, y1, x2, y2))
-        if cropped.mode == 'RGBA':
-            cropped = cropped.convert('RGB')
-        save_path = os.path.join(save_dir, f"{class_name}_{idx}_score{score:.2f}.jpg")
-        cropped.save(save_path)
-    tqdm.write(f"Saved a total of {len(boxes)} screenshots, saved by category in {save_base_dir}/")
\ No newline at end of file
+    # FP16 roughly matches FP32 accuracy for layout detection while doubling
+    # tensor-core throughput; only valid on CUDA devices.
+    det_results = model.predict(image_path, imgsz=imgsz, conf=conf, device=device, half=device.startswith("cuda"))
+    process_detections(image, det_results[0], save_base_dir)
@@ -13,7 +13,7 @@ from typing import Optional
 from tqdm.asyncio import tqdm
 
 from pragent.backend.text_pipeline import pipeline as run_text_extraction
-from pragent.backend.figure_table_pipeline import run_figure_extraction
+from pragent.backend.figure_table_pipeline import run_figure_extraction_async
 from pragent.backend.blog_pipeline import generate_text_blog, generate_final_post, generate_baseline_post
 
 def get_pdf_hash(file_path: Path) -> str:
@@ -110,7 +110,7 @@ async def process_single_project(project_path: Path, args: argparse.Namespace, p
                         tqdm.write(f"[*] Cache miss for PDF figures '{pdf_path.name}'. Running extraction.")
                 extraction_work_dir = work_dir / "figure_extraction"
                 extraction_work_dir.mkdir()
-                paired_dir = run_figure_extraction(str(pdf_path), str(extraction_work_dir), args.model_path)
+                paired_dir = await run_figure_extraction_async(str(pdf_path), str(extraction_work_dir), args.model_path)
                 
                 if paired_dir and cached_figures_path:
                     tqdm.write(f"[*] Saving extracted figures to cache at: {cached_figures_path}")
@@ -236,7 +236,7 @@ async def process_baseline_project(
                 
                 extraction_work_dir = work_dir / "figure_extraction"
                 extraction_work_dir.mkdir()
-                extracted_data_dir = run_figure_extraction(str(pdf_path), str(extraction_work_dir), args.model_path)
+                extracted_data_dir = await run_figure_extraction_async(str(pdf_path), str(extraction_work_dir), args.model_path)
                 
                 if extracted_data_dir and any(Path(extracted_data_dir).iterdir()):
                     paired_dir = extracted_data_dir